@@ -1,19 +1,39 @@
 from communication.message_schema import ServiceRequest, ServiceResponse
 from ledger.mock_ledger import MockLedger
-import random
+from typing import Optional
+import numpy as np
+from collections import deque
 import time
 
 class AgentBase:
-    def __init__(self, name, services, ledger: MockLedger):
+    HISTORY_SIZE = 10_000  # most recent completed services kept in history
+    
+    def __init__(self, name, services, ledger: MockLedger,
+                 rng: Optional[np.random.Generator] = None):
         self.name = name
+        self._rng = rng if rng is not None else np.random.default_rng()
         self.services = services  # {service_name: base_price}
         self.ledger = ledger
         self.balance = 100
-        self.service_history = []
+        self.service_history = deque(maxlen=self.HISTORY_SIZE)
+        self.services_completed = 0
+        self._price_cache = {}  # {(service_type, load, base_demand): price}
         self.success_rate = 0.95
-        self.response_time = random.uniform(1, 3)  # seconds
+        self.response_time = self._rng.uniform(1, 3)  # seconds
         self.load = 0  # current workload
         self.reputation = 5.0  # out of 5
+        self.simulate_latency = False  # sleep in handle_request to mimic work
+    
+    @property
+    def load(self):
+        return self._load
+    
+    @load.setter
+    def load(self, value):
+        # Dynamic prices depend on load, so drop cached quotes when it changes
+        if value != getattr(self, '_load', None):
+            self._price_cache.clear()
+        self._load = value
         
     def list_services(self):
         """Return available services with current pricing"""
@@ -29,10 +49,15 @@ class AgentBase:
     
     def get_dynamic_price(self, service_type, base_demand=1.0):
         """Calculate dynamic pricing based on load and demand"""
-        base_price = self.services.get(service_type, 0)
-        load_multiplier = 1 + (self.load * 0.1)  # 10% increase per load unit
-        demand_multiplier = base_demand
-        return int(base_price * load_multiplier * demand_multiplier)
+        key = (service_type, self._load, base_demand)
+        price = self._price_cache.get(key)
+        if price is None:
+            base_price = self.services.get(service_type, 0)
+            load_multiplier = 1 + (self._load * 0.1)  # 10% increase per load unit
+            demand_multiplier = base_demand
+            price = int(base_price * load_multiplier * demand_multiplier)
+            self._price_cache[key] = price
+        return price
     
     def handle_request(self, request: ServiceRequest):
         """Process incoming service request"""
@@ -52,8 +77,9 @@ class AgentBase:
             # Process payment
             if self.ledger.transfer(request.sender, self.name, request.offered_price):
                 # Simulate service execution
-                execution_time = random.uniform(1, 5)
-                time.sleep(0.1)  # Simulate processing
+                execution_time = self._rng.uniform(1, 5)
+                if self.simulate_latency:
+                    time.sleep(0.1)  # Simulate processing
                 
                 # Update history
                 self.service_history.append({
@@ -62,6 +88,7 @@ class AgentBase:
                     'client': request.sender,
                     'timestamp': time.time()
                 })
+                self.services_completed += 1
                 
                 self.load = max(0, self.load - 1)  # Reduce load after completion
                 
@@ -0,0 +1,47 @@
+import numpy as np
+
+from utils.jit import njit
+
+@njit(cache=True, fastmath=True)
+def ucb1_step(counts, mean, total, c):
+    """Return the arm UCB1 would pick for the given counts and mean rewards"""
+    log_t = np.log(max(total, 1))
+    best = 0
+    best_value = 0.0
+    for i in range(counts.shape[0]):
+        if counts[i] == 0:
+            return i  # Select unplayed arms first
+        value = mean[i] + c * np.sqrt(log_t / counts[i])
+        if i == 0 or value > best_value:
+            best = i
+            best_value = value
+    return best
+
+@njit(cache=True)
+def ucb1_run(counts, mean, total, rewards, c):
+    """Run UCB1 over a (T, K) reward stream, updating counts/mean in place"""
+    arms = np.empty(rewards.shape[0], dtype=np.int64)
+    for t in range(rewards.shape[0]):
+        i = ucb1_step(counts, mean, total, c)
+        counts[i] += 1
+        mean[i] += (rewards[t, i] - mean[i]) / counts[i]
+        total += 1
+        arms[t] = i
+    return arms
+
+@njit(cache=True)
+def epsilon_greedy_run(counts, mean, rewards, explore, explore_arms):
+    """Run epsilon-greedy over a (T, K) reward stream with pre-drawn exploration"""
+    arms = np.empty(rewards.shape[0], dtype=np.int64)
+    for t in range(rewards.shape[0]):
+        if explore[t]:
+            i = explore_arms[t]
+        else:
+            i = 0
+            for j in range(1, counts.shape[0]):
+                if mean[j] > mean[i]:
+                    i = j
+        counts[i] += 1
+        mean[i] += (rewards[t, i] - mean[i]) / counts[i]
+        arms[t] = i
+    return arms
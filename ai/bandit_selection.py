@@ -1,124 +1,185 @@
 import numpy as np
-import random
-from typing import List, Dict, Any
+import math
+from collections import deque
+from typing import List, Dict, Any, ClassVar, Optional
 import time
 
 class MultiArmedBandit:
-    def __init__(self, agents: List[str], initial_confidence: float = 1.0):
+    RECENT_WINDOW = 16  # ring buffer size backing the "last 10 rewards" stat
+    
+    def __init__(self, agents: List[str], initial_confidence: float = 1.0,
+                 rng: Optional[np.random.Generator] = None):
+        # initial_confidence is accepted for compatibility but unused: UCB1 derives its bound from counts
         self.agents = agents
-        self.rewards = {agent: [] for agent in agents}
-        self.selection_count = {agent: 0 for agent in agents}
-        self.cumulative_reward = {agent: 0.0 for agent in agents}
-        self.confidence_interval = {agent: initial_confidence for agent in agents}
+        self._idx = {agent: i for i, agent in enumerate(agents)}
+        k = len(agents)
+        # Structure-of-arrays state, indexed by position in self.agents
+        self._counts = np.zeros(k, dtype=np.int64)
+        self._mean = np.zeros(k, dtype=np.float64)  # running mean reward
+        self._recent = np.zeros((k, self.RECENT_WINDOW), dtype=np.float64)
+        # Beta posterior parameters for Thompson sampling
+        self.alpha = np.ones(k, dtype=np.float64)
+        self.beta = np.ones(k, dtype=np.float64)
         self.total_selections = 0
+        self._rng = rng if rng is not None else np.random.default_rng()
         
     def select_epsilon_greedy(self, epsilon: float = 0.1) -> str:
         """Epsilon-greedy selection strategy"""
-        if random.random() < epsilon or self.total_selections == 0:
+        if self._rng.random() < epsilon or self.total_selections == 0:
             # Explore: random selection
-            return random.choice(self.agents)
-        else:
-            # Exploit: choose agent with highest average reward
-            avg_rewards = {
-                agent: self.cumulative_reward[agent] / max(self.selection_count[agent], 1)
-                for agent in self.agents
-            }
-            return max(avg_rewards, key=avg_rewards.get)
+            return self.agents[self._rng.integers(len(self.agents))]
+        # Exploit: choose agent with highest average reward
+        return self.agents[int(np.argmax(self._mean))]
     
     def select_ucb1(self, c: float = 2.0) -> str:
         """Upper Confidence Bound selection strategy"""
         if self.total_selections == 0:
-            return random.choice(self.agents)
-        
-        ucb_values = {}
-        for agent in self.agents:
-            if self.selection_count[agent] == 0:
-                ucb_values[agent] = float('inf')  # Select unplayed agents first
-            else:
-                avg_reward = self.cumulative_reward[agent] / self.selection_count[agent]
-                confidence = c * np.sqrt(np.log(self.total_selections) / self.selection_count[agent])
-                ucb_values[agent] = avg_reward + confidence
+            return self.agents[self._rng.integers(len(self.agents))]
         
-        return max(ucb_values, key=ucb_values.get)
+        log_t = math.log(self.total_selections)  # scalar, shared by every agent
+        confidence = c * np.sqrt(log_t / np.maximum(self._counts, 1))
+        # Select unplayed agents first
+        ucb_values = np.where(self._counts == 0, np.inf, self._mean + confidence)
+        return self.agents[int(np.argmax(ucb_values))]
     
     def select_thompson_sampling(self) -> str:
         """Thompson Sampling selection strategy"""
-        samples = {}
-        for agent in self.agents:
-            # Use Beta distribution for reward sampling
-            successes = max(1, sum(1 for r in self.rewards[agent] if r > 0.5))
-            failures = max(1, len(self.rewards[agent]) - successes + 1)
-            samples[agent] = np.random.beta(successes, failures)
-        
-        return max(samples, key=samples.get)
+        # Draw one Beta sample per agent in a single vectorized call
+        samples = self._rng.beta(self.alpha, self.beta)
+        return self.agents[int(np.argmax(samples))]
     
     def update_reward(self, agent: str, reward: float):
         """Update reward for selected agent"""
-        self.rewards[agent].append(reward)
-        self.cumulative_reward[agent] += reward
-        self.selection_count[agent] += 1
+        i = self._idx[agent]
+        self._recent[i, self._counts[i] % self.RECENT_WINDOW] = reward
+        self._counts[i] += 1
+        self._mean[i] += (reward - self._mean[i]) / self._counts[i]
+        if reward > 0.5:
+            self.alpha[i] += 1
+        else:
+            self.beta[i] += 1
         self.total_selections += 1
     
+    def simulate(self, rewards: np.ndarray, strategy: str = 'ucb1',
+                 c: float = 2.0, epsilon: float = 0.1) -> np.ndarray:
+        """Run a whole episode against a (T, K) reward stream in compiled code"""
+        # The kernels pull in numba, which only pays off once an episode actually runs
+        from ai.bandit_kernels import ucb1_run, epsilon_greedy_run
+        
+        rewards = np.ascontiguousarray(rewards, dtype=np.float64)
+        # The kernels index rewards[t, arm] unchecked, so reject mismatched streams up front
+        if rewards.ndim != 2 or rewards.shape[1] != len(self.agents):
+            raise ValueError(
+                f"rewards must have shape (T, {len(self.agents)}), got {rewards.shape}"
+            )
+        steps = rewards.shape[0]
+        if strategy == 'ucb1':
+            arms = ucb1_run(self._counts, self._mean, self.total_selections, rewards, c)
+        elif strategy == 'epsilon_greedy':
+            explore = self._rng.random(steps) < epsilon
+            if self.total_selections == 0 and steps:
+                explore[0] = True
+            explore_arms = self._rng.integers(len(self.agents), size=steps)
+            arms = epsilon_greedy_run(self._counts, self._mean, rewards, explore, explore_arms)
+        else:
+            raise ValueError(f"Unknown strategy: {strategy}")
+        
+        # Fold the episode into the remaining summary stats
+        chosen = rewards[np.arange(steps), arms]
+        success = chosen > 0.5
+        self.alpha += np.bincount(arms[success], minlength=len(self.agents))
+        self.beta += np.bincount(arms[~success], minlength=len(self.agents))
+        for i in range(len(self.agents)):
+            recent = chosen[arms == i][-self.RECENT_WINDOW:]
+            end = int(self._counts[i])
+            self._recent[i, np.arange(end - len(recent), end) % self.RECENT_WINDOW] = recent
+        self.total_selections += steps
+        return arms
+    
+    def _recent_avg(self, i: int, n: int = 10) -> float:
+        """Mean of the last n rewards recorded for agent index i"""
+        count = int(self._counts[i])
+        n = min(n, count)
+        if n == 0:
+            return 0.0
+        slots = np.arange(count - n, count) % self.RECENT_WINDOW
+        return float(self._recent[i, slots].mean())
+    
     def get_stats(self) -> Dict[str, Any]:
         """Get bandit statistics"""
         stats = {}
-        for agent in self.agents:
-            count = self.selection_count[agent]
-            if count > 0:
-                avg_reward = self.cumulative_reward[agent] / count
-                recent_rewards = self.rewards[agent][-10:]  # Last 10 rewards
-                recent_avg = np.mean(recent_rewards) if recent_rewards else 0
-            else:
-                avg_reward = 0
-                recent_avg = 0
-            
+        for i, agent in enumerate(self.agents):
             stats[agent] = {
-                'selections': count,
-                'avg_reward': round(avg_reward, 3),
-                'recent_avg': round(recent_avg, 3),
-                'total_reward': round(self.cumulative_reward[agent], 2)
+                'selections': int(self._counts[i]),
+                'avg_reward': round(float(self._mean[i]), 3),
+                'recent_avg': round(self._recent_avg(i), 3),  # Last 10 rewards
+                'total_reward': round(float(self._mean[i] * self._counts[i]), 2)
             }
         
         return stats
 
 class ContextualBandit:
-    def __init__(self, agents: List[str], context_dimensions: int = 4):
+    HISTORY_SIZE = 10_000  # most recent weight updates kept in history
+    CONTEXT_CACHE_SIZE = 4096  # bucketed contexts kept by get_bucketed_context
+    _SERVICE_COMPLEXITY: ClassVar[Dict[str, float]] = {
+        'clean_data': 0.3, 'translate_text': 0.5, 'analyze_sentiment': 0.6,
+        'run_analysis': 0.8, 'generate_report': 0.9, 'optimize_model': 1.0
+    }
+    
+    def __init__(self, agents: List[str], context_dimensions: int = 4,
+                 rng: Optional[np.random.Generator] = None):
         self.agents = agents
+        self._rng = rng if rng is not None else np.random.default_rng()
         self.context_dim = context_dimensions
-        # Simple linear model: reward = context * weights
-        self.weights = {agent: np.random.normal(0, 0.1, context_dimensions) 
-                      for agent in agents}
-        self.history = []
+        self._idx = {agent: i for i, agent in enumerate(agents)}
+        # Simple linear model: reward = context * weights, one row per agent
+        self.W = self._rng.normal(
+            0, 0.1, (len(agents), context_dimensions)
+        ).astype(np.float32)
+        self.history = deque(maxlen=self.HISTORY_SIZE)
+        self._context_cache = {}  # {(service, urgency/10, budget, hour): context}
         
     def get_context(self, service_type: str, urgency: float, budget: int, 
                    time_of_day: float) -> np.ndarray:
         """Convert situational factors to context vector"""
-        service_complexity = {
-            'clean_data': 0.3, 'translate_text': 0.5, 'analyze_sentiment': 0.6,
-            'run_analysis': 0.8, 'generate_report': 0.9, 'optimize_model': 1.0
-        }.get(service_type, 0.5)
+        service_complexity = self._SERVICE_COMPLEXITY.get(service_type, 0.5)
         
-        return np.array([service_complexity, urgency, budget/100.0, time_of_day])
+        return np.array([service_complexity, urgency, budget * 0.01, time_of_day],
+                        dtype=np.float32)
+    
+    def get_bucketed_context(self, service_type: str, urgency: float, budget: int,
+                             time_of_day: float) -> np.ndarray:
+        """Context vector with urgency in tenths and time of day in hours, cached"""
+        key = (service_type, round(urgency * 10), int(budget), round(time_of_day * 24))
+        context = self._context_cache.get(key)
+        if context is None:
+            if len(self._context_cache) >= self.CONTEXT_CACHE_SIZE:
+                self._context_cache.clear()
+            context = self.get_context(service_type, key[1] / 10, key[2], key[3] / 24)
+            context.flags.writeable = False  # shared between callers
+            self._context_cache[key] = context
+        return context
     
     def predict_reward(self, agent: str, context: np.ndarray) -> float:
         """Predict reward for agent given context"""
-        return np.dot(self.weights[agent], context)
+        return float(self.W[self._idx[agent]] @ context)
     
     def select_agent(self, context: np.ndarray, exploration: float = 0.1) -> str:
         """Select agent based on predicted rewards"""
-        if random.random() < exploration:
-            return random.choice(self.agents)
+        if self._rng.random() < exploration:
+            return self.agents[self._rng.integers(len(self.agents))]
         
-        predictions = {agent: self.predict_reward(agent, context) 
-                      for agent in self.agents}
-        return max(predictions, key=predictions.get)
+        # Score every agent with a single matrix-vector product
+        predictions = self.W @ context
+        return self.agents[int(np.argmax(predictions))]
     
     def update_weights(self, agent: str, context: np.ndarray, reward: float, 
                       learning_rate: float = 0.01):
         """Update agent weights based on observed reward"""
-        predicted = self.predict_reward(agent, context)
+        i = self._idx[agent]
+        predicted = float(self.W[i] @ context)
         error = reward - predicted
-        self.weights[agent] += learning_rate * error * context
+        self.W[i] += learning_rate * error * context
         
         self.history.append({
             'agent': agent,
@@ -1,54 +1,70 @@
 import numpy as np
-import random
+from collections import deque
 from typing import Dict, Tuple, Optional
 
+# Category boundaries for state binning: 0 = low, 1 = fair/medium, 2 = high
+_PRICE_TH = np.array([0.8, 1.2])
+_REP_TH = np.array([3.0, 4.5])
+_URG_TH = np.array([0.3, 0.7])
+
 class RLNegotiator:
-    def __init__(self, learning_rate=0.1, discount_factor=0.9, epsilon=0.1):
-        self.q_table = {}  # {state: {action: q_value}}
+    ACTIONS = ("accept", "reject", "counter_low", "counter_high")
+    Q_BLOCK_ROWS = 256  # Q-table grows in blocks of this many states
+    HISTORY_SIZE = 10_000  # most recent negotiations kept in history
+    
+    def __init__(self, learning_rate=0.1, discount_factor=0.9, epsilon=0.1,
+                 rng: Optional[np.random.Generator] = None):
         self.learning_rate = learning_rate
         self.discount_factor = discount_factor
         self.epsilon = epsilon  # exploration rate
-        self.actions = ["accept", "reject", "counter_low", "counter_high"]
-        self.negotiation_history = []
+        self._rng = rng if rng is not None else np.random.default_rng()
+        self.actions = list(self.ACTIONS)
+        self._action_idx = {action: i for i, action in enumerate(self.ACTIONS)}
+        self._service_id = {}  # {service_type: int}
+        self._state_id = {}  # {(service_id, price_cat, rep_cat, urg_cat): row in Q}
+        self.Q = np.zeros((self.Q_BLOCK_ROWS, len(self.ACTIONS)))
+        self.negotiation_history = deque(maxlen=self.HISTORY_SIZE)
+    
+    def _intern(self, key: tuple) -> int:
+        """Map a state tuple to its Q-table row, allocating a new row if needed"""
+        state = self._state_id.get(key)
+        if state is None:
+            state = len(self._state_id)
+            self._state_id[key] = state
+            if state >= len(self.Q):
+                self.Q = np.vstack([self.Q, np.zeros_like(self.Q[:self.Q_BLOCK_ROWS])])
+        return state
         
     def get_state(self, service_type: str, offered_price: int, market_price: int, 
-                  agent_reputation: float, urgency: float = 0.5) -> str:
-        """Convert negotiation context to state string"""
+                  agent_reputation: float, urgency: float = 0.5) -> int:
+        """Convert negotiation context to an integer state id"""
+        service_id = self._service_id.setdefault(service_type, len(self._service_id))
         price_ratio = offered_price / max(market_price, 1)
-        price_category = "low" if price_ratio < 0.8 else "fair" if price_ratio < 1.2 else "high"
-        reputation_category = "low" if agent_reputation < 3.0 else "medium" if agent_reputation < 4.5 else "high"
-        urgency_category = "low" if urgency < 0.3 else "medium" if urgency < 0.7 else "high"
+        # side='right' keeps each boundary value in the upper category
+        price_category = int(np.searchsorted(_PRICE_TH, price_ratio, side='right'))
+        reputation_category = int(np.searchsorted(_REP_TH, agent_reputation, side='right'))
+        urgency_category = int(np.searchsorted(_URG_TH, urgency, side='right'))
         
-        return f"{service_type}_{price_category}_{reputation_category}_{urgency_category}"
+        return self._intern((service_id, price_category, reputation_category, urgency_category))
     
-    def get_action(self, state: str, explore: bool = True) -> str:
+    def get_action(self, state: int, explore: bool = True) -> str:
         """Get action based on current state using epsilon-greedy policy"""
-        if state not in self.q_table:
-            self.q_table[state] = {action: 0.0 for action in self.actions}
-        
-        if explore and random.random() < self.epsilon:
-            return random.choice(self.actions)
+        if explore and self._rng.random() < self.epsilon:
+            return self.ACTIONS[self._rng.integers(len(self.ACTIONS))]
         
         # Choose action with highest Q-value
-        return max(self.q_table[state], key=self.q_table[state].get)
+        return self.ACTIONS[int(np.argmax(self.Q[state]))]
     
-    def update_q_value(self, state: str, action: str, reward: float, next_state: str = None):
+    def update_q_value(self, state: int, action: str, reward: float, next_state: int = None):
         """Update Q-value using Q-learning algorithm"""
-        if state not in self.q_table:
-            self.q_table[state] = {action: 0.0 for action in self.actions}
-        
-        if next_state and next_state not in self.q_table:
-            self.q_table[next_state] = {action: 0.0 for action in self.actions}
+        a = self._action_idx[action]
+        current_q = self.Q[state, a]
+        max_next_q = self.Q[next_state].max() if next_state is not None else 0
         
         # Q-learning update
-        current_q = self.q_table[state][action]
-        max_next_q = max(self.q_table[next_state].values()) if next_state else 0
-        
-        new_q = current_q + self.learning_rate * (
+        self.Q[state, a] = current_q + self.learning_rate * (
             reward + self.discount_factor * max_next_q - current_q
         )
-        
-        self.q_table[state][action] = new_q
     
     def negotiate(self, service_type: str, initial_offer: int, market_price: int,
                   agent_reputation: float, max_rounds: int = 3) -> Tuple[str, int]:
@@ -106,16 +122,16 @@ class RLNegotiator:
     
     def get_strategy_stats(self):
         """Get statistics about learned strategies"""
-        if not self.q_table:
+        n_states = len(self._state_id)
+        if not n_states:
             return {"message": "No learning data available"}
         
-        action_preferences = {action: 0 for action in self.actions}
-        for state_actions in self.q_table.values():
-            best_action = max(state_actions, key=state_actions.get)
-            action_preferences[best_action] += 1
+        best_actions = np.argmax(self.Q[:n_states], axis=1)
+        counts = np.bincount(best_actions, minlength=len(self.ACTIONS))
+        action_preferences = {action: int(counts[i]) for i, action in enumerate(self.ACTIONS)}
         
         return {
-            "states_learned": len(self.q_table),
+            "states_learned": n_states,
             "action_preferences": action_preferences,
             "exploration_rate": self.epsilon
         }
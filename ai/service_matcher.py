@@ -1,70 +1,182 @@
 import numpy as np
-from sklearn.linear_model import LogisticRegression
-from sklearn.ensemble import RandomForestClassifier
 from typing import List, Dict, Tuple, Optional
-import pandas as pd
+
+def _sigmoid(z: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-np.clip(z, -500, 500)))
+
+class _LogisticModel:
+    """L2-regularized logistic regression fitted with Newton (IRLS) steps"""
+    def __init__(self, l2: float = 1.0, max_iter: int = 25):
+        self.l2 = l2
+        self.max_iter = max_iter
+        self.coef = None
+        
+    def fit(self, X: np.ndarray, y: np.ndarray):
+        Xb = np.hstack([X, np.ones((len(X), 1))])  # bias column
+        penalty = np.full(Xb.shape[1], self.l2)
+        penalty[-1] = 1e-6  # leave the intercept (almost) unregularized
+        w = np.zeros(Xb.shape[1])
+        for _ in range(self.max_iter):
+            p = _sigmoid(Xb @ w)
+            grad = Xb.T @ (p - y) + penalty * w
+            hessian = (Xb.T * (p * (1 - p))) @ Xb + np.diag(penalty)
+            step = np.linalg.solve(hessian, grad)
+            w -= step
+            if np.abs(step).max() < 1e-6:
+                break
+        self.coef = w
+        return self
+    
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        p = _sigmoid(X @ self.coef[:-1] + self.coef[-1])
+        return np.column_stack([1 - p, p])
+
+class _TreeEnsemble:
+    """Bagged depth-limited decision trees stored as flat NumPy node arrays"""
+    def __init__(self, n_trees: int = 16, max_depth: int = 4, random_state: int = 42):
+        self.n_trees = n_trees
+        self.max_depth = max_depth
+        self.random_state = random_state
+        
+    def fit(self, X: np.ndarray, y: np.ndarray):
+        # sklearn is only needed to grow the trees, not to evaluate them
+        from sklearn.tree import DecisionTreeClassifier
+        
+        X = np.asarray(X, dtype=np.float32)  # convert once, not per tree
+        rng = np.random.default_rng(self.random_state)
+        feature, threshold, left, right, value, roots = [], [], [], [], [], []
+        offset = 0
+        for _ in range(self.n_trees):
+            # Bootstrap via per-row sample weights instead of copying X
+            sample = rng.integers(len(X), size=len(X))
+            tree = DecisionTreeClassifier(
+                max_depth=self.max_depth, max_features='sqrt',
+                random_state=int(rng.integers(2**31 - 1))
+            ).fit(X, y, sample_weight=np.bincount(sample, minlength=len(X)))
+            t = tree.tree_
+            nodes = np.arange(t.node_count)
+            is_leaf = t.children_left == -1
+            # Leaves loop back to themselves so traversal can run a fixed depth
+            feature.append(np.where(is_leaf, 0, t.feature))
+            threshold.append(np.where(is_leaf, np.inf, t.threshold))
+            left.append(np.where(is_leaf, nodes, t.children_left) + offset)
+            right.append(np.where(is_leaf, nodes, t.children_right) + offset)
+            counts = t.value[:, 0, :]
+            positive = np.flatnonzero(tree.classes_ == 1)
+            value.append(
+                counts[:, positive[0]] / counts.sum(axis=1) if positive.size
+                else np.zeros(t.node_count)
+            )
+            roots.append(offset)
+            offset += t.node_count
+        
+        self.feature = np.concatenate(feature)
+        self.threshold = np.concatenate(threshold)
+        self.left = np.concatenate(left)
+        self.right = np.concatenate(right)
+        self.value = np.concatenate(value)
+        self.roots = np.array(roots)
+        return self
+    
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32)  # trees split on float32 thresholds
+        rows = np.arange(len(X))
+        nodes = np.repeat(self.roots[:, None], len(X), axis=1)  # (n_trees, n_rows)
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        p = self.value[nodes].mean(axis=0)
+        return np.column_stack([1 - p, p])
 
 class ServiceMatcher:
+    HISTORY_SIZE = 10_000  # most recent service outcomes kept for training
+    # Column order of the per-agent feature matrix
+    AGENT_FEATURES = ('success_rate', 'avg_response_time', 'reputation',
+                      'price_competitiveness', 'specialization_score', 'availability')
+    # Column order of the service history buffer; the first 7 are model inputs
+    HISTORY_COLUMNS = AGENT_FEATURES + ('price_ratio', 'completion_time', 'satisfaction')
+    
     def __init__(self):
-        self.agent_features = {}  # Store agent performance features
-        self.service_history = []
+        # Agent performance features, one row per agent
+        self._F = np.zeros((0, len(self.AGENT_FEATURES)), dtype=np.float32)
+        self._row = {}  # {agent_name: row in self._F}
+        # Ring buffer of service outcomes, written at self._n % HISTORY_SIZE
+        self._history = np.zeros((self.HISTORY_SIZE, len(self.HISTORY_COLUMNS)))
+        self._n = 0
         self.models = {}  # ML models for different services
         self.is_trained = False
         
     def add_agent_features(self, agent_name: str, features: Dict):
         """Add/update agent features for matching"""
-        self.agent_features[agent_name] = {
-            'success_rate': features.get('success_rate', 0.9),
-            'avg_response_time': features.get('response_time', 2.0),
-            'reputation': features.get('reputation', 3.0),
-            'price_competitiveness': features.get('price_competitiveness', 0.5),
-            'specialization_score': features.get('specialization_score', 0.5),
-            'availability': features.get('availability', 0.8)
+        row = (
+            features.get('success_rate', 0.9),
+            features.get('response_time', 2.0),
+            features.get('reputation', 3.0),
+            features.get('price_competitiveness', 0.5),
+            features.get('specialization_score', 0.5),
+            features.get('availability', 0.8)
+        )
+        if agent_name in self._row:
+            self._F[self._row[agent_name]] = row
+        else:
+            self._row[agent_name] = len(self._F)
+            self._F = np.vstack([self._F, np.array(row, dtype=np.float32)])
+    
+    @property
+    def agent_features(self) -> Dict[str, Dict[str, float]]:
+        """Per-agent feature dicts, materialized from the feature matrix"""
+        return {
+            agent: dict(zip(self.AGENT_FEATURES, self._F[row].tolist()))
+            for agent, row in self._row.items()
         }
     
     def record_service_outcome(self, agent_name: str, service_type: str, 
                              client_satisfaction: float, completion_time: float,
                              price_paid: int, market_price: int):
         """Record service outcome for training"""
-        if agent_name in self.agent_features:
-            features = self.agent_features[agent_name].copy()
-            features.update({
-                'service_type': service_type,
-                'price_ratio': price_paid / max(market_price, 1),
-                'completion_time': completion_time,
-                'satisfaction': client_satisfaction
-            })
-            self.service_history.append(features)
+        if agent_name in self._row:
+            record = self._history[self._n % self.HISTORY_SIZE]
+            record[:len(self.AGENT_FEATURES)] = self._F[self._row[agent_name]]
+            record[len(self.AGENT_FEATURES):] = (
+                price_paid / max(market_price, 1),
+                completion_time,
+                client_satisfaction
+            )
+            self._n += 1
+    
+    @property
+    def service_records(self) -> int:
+        """Number of service outcomes currently held for training"""
+        return min(self._n, self.HISTORY_SIZE)
     
     def train_models(self):
         """Train ML models for service matching"""
-        if len(self.service_history) < 10:  # Need minimum data
+        if self.service_records < 10:  # Need minimum data
             return False
         
-        df = pd.DataFrame(self.service_history)
-        
         # Prepare features and targets
-        feature_cols = ['success_rate', 'avg_response_time', 'reputation', 
-                       'price_competitiveness', 'specialization_score', 
-                       'availability', 'price_ratio']
-        
-        X = df[feature_cols].fillna(0)
+        history = self._history[:self.service_records]
+        # Shared by all three fits; trees split on float32 anyway
+        X = np.nan_to_num(history[:, :7], nan=0.0).astype(np.float32)
+        price_ratio = history[:, 6]
+        completion_time = history[:, 7]
+        satisfaction = history[:, 8]
         
         # Train different models for different criteria
         # 1. Overall satisfaction prediction
-        y_satisfaction = (df['satisfaction'] > 0.7).astype(int)
-        self.models['satisfaction'] = RandomForestClassifier(n_estimators=50, random_state=42)
+        y_satisfaction = (satisfaction > 0.7).astype(np.int8)
+        self.models['satisfaction'] = _TreeEnsemble(n_trees=16, random_state=42)
         self.models['satisfaction'].fit(X, y_satisfaction)
         
         # 2. Fast completion prediction
-        y_fast = (df['completion_time'] < df['completion_time'].median()).astype(int)
-        self.models['speed'] = LogisticRegression(random_state=42)
+        y_fast = (completion_time < np.median(completion_time)).astype(np.int8)
+        self.models['speed'] = _LogisticModel()
         self.models['speed'].fit(X, y_fast)
         
         # 3. Value for money prediction
-        df['value_score'] = df['satisfaction'] / (df['price_ratio'] + 0.1)
-        y_value = (df['value_score'] > df['value_score'].median()).astype(int)
-        self.models['value'] = RandomForestClassifier(n_estimators=30, random_state=42)
+        value_score = satisfaction / (price_ratio + 0.1)
+        y_value = (value_score > np.median(value_score)).astype(np.int8)
+        self.models['value'] = _TreeEnsemble(n_trees=16, random_state=42)
         self.models['value'].fit(X, y_value)
         
         self.is_trained = True
@@ -77,52 +189,41 @@ class ServiceMatcher:
             # Fallback to simple ranking
             return self._simple_ranking(available_agents, criteria)
         
-        agent_scores = []
-        for agent in available_agents:
-            if agent in self.agent_features:
-                features = self.agent_features[agent].copy()
-                # Add contextual features
-                features['price_ratio'] = features.get('base_price', market_price) / market_price
-                
-                feature_vector = np.array([[
-                    features['success_rate'],
-                    features['avg_response_time'],
-                    features['reputation'],
-                    features['price_competitiveness'],
-                    features['specialization_score'],
-                    features['availability'],
-                    features['price_ratio']
-                ]])
-                
-                # Get prediction probability
-                score = self.models[criteria].predict_proba(feature_vector)[0][1]
-                agent_scores.append((agent, score))
+        ranked_agents = [agent for agent in available_agents if agent in self._row]
+        if not ranked_agents:
+            return []
+        
+        # Stack all agents into one feature matrix for a single predict_proba call
+        rows = [self._row[agent] for agent in ranked_agents]
+        # Contextual feature: no per-agent base price is tracked, so quotes sit at market price
+        price_ratios = np.ones(len(rows), dtype=np.float32)
+        feature_matrix = np.hstack([self._F[rows], price_ratios[:, None]])
         
-        return sorted(agent_scores, key=lambda x: x[1], reverse=True)
+        # Get prediction probabilities
+        scores = self.models[criteria].predict_proba(feature_matrix)[:, 1]
+        order = np.argsort(-scores, kind='stable')
+        return [(ranked_agents[i], float(scores[i])) for i in order]
     
     def _simple_ranking(self, available_agents: List[str], criteria: str) -> List[Tuple[str, float]]:
         """Simple fallback ranking when ML models aren't available"""
-        agent_scores = []
-        for agent in available_agents:
-            if agent in self.agent_features:
-                features = self.agent_features[agent]
-                if criteria == 'satisfaction':
-                    score = (features['success_rate'] * 0.4 + 
-                            features['reputation'] / 5.0 * 0.6)
-                elif criteria == 'speed':
-                    score = 1.0 / (features['avg_response_time'] + 0.1)
-                elif criteria == 'value':
-                    score = (features['success_rate'] * features['price_competitiveness'])
-                else:
-                    score = features['reputation'] / 5.0
-                
-                agent_scores.append((agent, score))
+        ranked_agents = [agent for agent in available_agents if agent in self._row]
+        F = self._F[[self._row[agent] for agent in ranked_agents]].astype(np.float64)
+        success_rate, response_time, reputation, price_competitiveness = F[:, 0], F[:, 1], F[:, 2], F[:, 3]
+        if criteria == 'satisfaction':
+            scores = success_rate * 0.4 + reputation / 5.0 * 0.6
+        elif criteria == 'speed':
+            scores = 1.0 / (response_time + 0.1)
+        elif criteria == 'value':
+            scores = success_rate * price_competitiveness
+        else:
+            scores = reputation / 5.0
         
-        return sorted(agent_scores, key=lambda x: x[1], reverse=True)
+        order = np.argsort(-scores, kind='stable')
+        return [(ranked_agents[i], float(scores[i])) for i in order]
     
     def get_recommendation(self, service_type: str, criteria: str = 'satisfaction') -> Optional[str]:
         """Get single best agent recommendation"""
-        available_agents = list(self.agent_features.keys())
+        available_agents = list(self._row)
         if not available_agents:
             return None
         
@@ -132,8 +233,8 @@ class ServiceMatcher:
     def get_matching_stats(self):
         """Get service matching statistics"""
         return {
-            'agents_tracked': len(self.agent_features),
-            'service_records': len(self.service_history),
+            'agents_tracked': len(self._row),
+            'service_records': self.service_records,
             'models_trained': len(self.models),
             'is_trained': self.is_trained
         }
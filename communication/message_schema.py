@@ -1,8 +1,8 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional
 import time
 
-@dataclass
+@dataclass(slots=True)
 class ServiceRequest:
     sender: str
     receiver: str
@@ -10,33 +10,21 @@ class ServiceRequest:
     offered_price: int
     deadline: Optional[float] = None
     requirements: Optional[dict] = None
-    timestamp: float = None
-    
-    def __post_init__(self):
-        if self.timestamp is None:
-            self.timestamp = time.time()
+    timestamp: float = field(default_factory=time.time)
 
-@dataclass
+@dataclass(slots=True)
 class ServiceResponse:
     success: bool
     message: str
     cost: int
     execution_time: float
-    timestamp: float = None
-    
-    def __post_init__(self):
-        if self.timestamp is None:
-            self.timestamp = time.time()
+    timestamp: float = field(default_factory=time.time)
 
-@dataclass
+@dataclass(slots=True)
 class NegotiationOffer:
     sender: str
     receiver: str
     service_type: str
     proposed_price: int
     counter_offer: bool = False
-    timestamp: float = None
-    
-    def __post_init__(self):
-        if self.timestamp is None:
-            self.timestamp = time.time()
\ No newline at end of file
+    timestamp: float = field(default_factory=time.time)
\ No newline at end of file
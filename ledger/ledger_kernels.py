@@ -0,0 +1,29 @@
+import numpy as np
+
+from utils.jit import njit
+
+NS_PER_HOUR = 3_600_000_000_000
+
+@njit(cache=True)
+def summarize(ts, amt, utc_offset_ns=0):
+    """One pass over flat transaction arrays: volume per (offset-adjusted) epoch hour"""
+    n = ts.shape[0]
+    if n == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    first = (ts[0] + utc_offset_ns) // NS_PER_HOUR
+    last = first
+    for t in range(n):
+        h = (ts[t] + utc_offset_ns) // NS_PER_HOUR
+        if h < first:
+            first = h
+        elif h > last:
+            last = h
+    # Dense hour buckets between the first and last transaction
+    vols = np.zeros(last - first + 1, dtype=np.int64)
+    seen = np.zeros(last - first + 1, dtype=np.bool_)
+    for t in range(n):
+        h = (ts[t] + utc_offset_ns) // NS_PER_HOUR - first
+        vols[h] += amt[t]
+        seen[h] = True
+    hours = np.nonzero(seen)[0]
+    return hours + first, vols[hours]
@@ -1,54 +1,131 @@
-from typing import Dict, List, Optional
+from typing import Dict, List, Mapping, Optional, Sequence
+from types import MappingProxyType
+from collections import defaultdict, deque
+from dataclasses import dataclass
+import array
+import atexit
+import itertools
+import os
 import time
 import json
 
+try:
+    import orjson
+    
+    def _dumps_line(record: dict) -> bytes:
+        return orjson.dumps(record) + b"\n"
+except ImportError:  # orjson is optional; fall back to stdlib json
+    def _dumps_line(record: dict) -> bytes:
+        return json.dumps(record, separators=(',', ':')).encode() + b"\n"
+
+# Transaction and lock ids: process start second plus a shared monotonic counter
+_ID_COUNTER = itertools.count()
+_PROCESS_START = int(time.time())
+
 class Transaction:
+    __slots__ = ('sender', 'receiver', 'amount', 'service', 'timestamp', 'tx_id')
+    
     def __init__(self, sender: str, receiver: str, amount: int, service: str = None):
         self.sender = sender
         self.receiver = receiver
         self.amount = amount
         self.service = service
-        self.timestamp = time.time()
-        self.tx_id = f"tx_{int(self.timestamp)}_{hash(f'{sender}{receiver}{amount}') % 10000}"
+        self.timestamp = time.time_ns()  # integer nanoseconds since the epoch
+        self.tx_id = f"tx_{_PROCESS_START}_{next(_ID_COUNTER)}"
+
+@dataclass(slots=True)
+class Lock:
+    agent: str
+    amount: int
+    purpose: str
+    timestamp: int  # nanoseconds since the epoch
 
 class MockLedger:
-    def __init__(self):
-        self.accounts = {}
-        self.transaction_history = []
+    HISTORY_SIZE = 10_000  # in-memory transactions kept when a log holds the full record
+    LOG_FLUSH_EVERY = 100  # transactions buffered before the log is flushed
+    
+    def __init__(self, log_path: Optional[str] = None, history_size: Optional[int] = None):
+        # Balances live in a flat int64 array indexed through a name -> slot map
+        self._name_to_idx = {}
+        self._balances = array.array('q')
+        # Optional append-only transaction log (one JSON object per line)
+        log_path = log_path or os.environ.get("A2A_LEDGER_LOG")
+        self._log = open(log_path, "ab") if log_path else None
+        self._unflushed = 0
+        if self._log:
+            atexit.register(self.flush)
+        # History is only capped on request, or when the log keeps every transaction
+        if history_size is None and self._log:
+            history_size = self.HISTORY_SIZE
+        self.transaction_history = deque(maxlen=history_size)
+        # {agent_name: [Transaction]} in time order
+        self._by_agent = defaultdict(lambda: deque(maxlen=history_size))
+        self._tx_count = 0
+        self._total_volume = 0  # running sum of transferred amounts, survives history eviction
         self.locked_funds = {}  # For escrow-like functionality
+        self._total_supply = 0  # balances + locked funds; transfers and locks keep it fixed
+        self.debug = False  # re-derive total supply in get_ledger_stats and check it
         
     def create_account(self, agent_name: str, initial_balance: int = 100):
         """Create a new account with initial balance"""
-        self.accounts[agent_name] = initial_balance
+        i = self._index(agent_name)
+        self._total_supply += initial_balance - self._balances[i]
+        self._balances[i] = initial_balance
+    
+    def _index(self, agent_name: str) -> int:
+        """Slot of an agent's balance, opening an empty account if needed"""
+        i = self._name_to_idx.get(agent_name)
+        if i is None:
+            i = self._name_to_idx[agent_name] = len(self._balances)
+            self._balances.append(0)
+        return i
         
     def get_balance(self, agent_name: str) -> int:
         """Get account balance"""
-        return self.accounts.get(agent_name, 0)
+        i = self._name_to_idx.get(agent_name)
+        return self._balances[i] if i is not None else 0
+    
+    def get_balances(self, agent_names) -> List[int]:
+        """Balances for several agents in one call, in the order given"""
+        idx, balances = self._name_to_idx, self._balances
+        return [balances[i] if (i := idx.get(name)) is not None else 0 for name in agent_names]
+    
+    @property
+    def accounts(self) -> Dict[str, int]:
+        """Balances keyed by agent name, materialized from the balance array"""
+        balances = self._balances
+        return {name: balances[i] for name, i in self._name_to_idx.items()}
+    
+    def snapshot(self) -> Mapping[str, int]:
+        """Read-only snapshot of all account balances for batched reads"""
+        return MappingProxyType(self.accounts)
     
     def transfer(self, sender: str, receiver: str, amount: int, service: str = None) -> bool:
         """Transfer tokens between accounts"""
-        if self.accounts.get(sender, 0) >= amount:
-            self.accounts[sender] -= amount
-            self.accounts[receiver] = self.accounts.get(receiver, 0) + amount
+        if self.get_balance(sender) >= amount:
+            self._balances[self._index(sender)] -= amount
+            self._balances[self._index(receiver)] += amount
             
             # Record transaction
             tx = Transaction(sender, receiver, amount, service)
             self.transaction_history.append(tx)
+            self._tx_count += 1
+            self._total_volume += amount
+            self._by_agent[sender].append(tx)
+            if receiver != sender:
+                self._by_agent[receiver].append(tx)
+            if self._log:
+                self._write_log(tx)
             
             return True
         return False
     
     def lock_funds(self, agent_name: str, amount: int, purpose: str) -> str:
         """Lock funds for escrow (e.g., during negotiation)"""
-        if self.accounts.get(agent_name, 0) >= amount:
-            self.accounts[agent_name] -= amount
-            lock_id = f"lock_{int(time.time())}_{hash(purpose) % 10000}"
-            self.locked_funds[lock_id] = {
-                'agent': agent_name,
-                'amount': amount,
-                'purpose': purpose,
-                'timestamp': time.time()
-            }
+        if self.get_balance(agent_name) >= amount:
+            self._balances[self._index(agent_name)] -= amount
+            lock_id = f"lock_{_PROCESS_START}_{next(_ID_COUNTER)}"
+            self.locked_funds[lock_id] = Lock(agent_name, amount, purpose, time.time_ns())
             return lock_id
         return None
     
@@ -56,7 +133,7 @@ class MockLedger:
         """Release locked funds to specified agent"""
         if lock_id in self.locked_funds:
             locked = self.locked_funds.pop(lock_id)
-            self.accounts[to_agent] = self.accounts.get(to_agent, 0) + locked['amount']
+            self._balances[self._index(to_agent)] += locked.amount
             return True
         return False
     
@@ -64,26 +141,57 @@ class MockLedger:
         """Return locked funds to original owner"""
         if lock_id in self.locked_funds:
             locked = self.locked_funds.pop(lock_id)
-            self.accounts[locked['agent']] += locked['amount']
+            self._balances[self._index(locked.agent)] += locked.amount
             return True
         return False
     
-    def get_transaction_history(self, agent_name: str = None) -> List[Transaction]:
+    def _write_log(self, tx: Transaction):
+        """Append a transaction to the on-disk log, flushing in batches"""
+        self._log.write(_dumps_line({
+            'tx_id': tx.tx_id,
+            'sender': tx.sender,
+            'receiver': tx.receiver,
+            'amount': tx.amount,
+            'service': tx.service,
+            'timestamp': tx.timestamp
+        }))
+        self._unflushed += 1
+        if self._unflushed >= self.LOG_FLUSH_EVERY:
+            self.flush()
+    
+    def flush(self):
+        """Flush buffered transaction log writes to disk"""
+        if self._log and self._unflushed:
+            self._log.flush()
+            self._unflushed = 0
+    
+    def get_transaction_history(self, agent_name: str = None) -> Sequence[Transaction]:
         """Get transaction history for an agent or all transactions"""
         if agent_name:
-            return [tx for tx in self.transaction_history 
-                   if tx.sender == agent_name or tx.receiver == agent_name]
+            return list(self._by_agent.get(agent_name, ()))
         return self.transaction_history
     
+    @property
+    def transaction_count(self) -> int:
+        """Transactions recorded so far; a cheap version token for cached reads"""
+        return self._tx_count
+    
+    @property
+    def total_volume(self) -> int:
+        """Tokens moved by all transfers, including ones evicted from capped history"""
+        return self._total_volume
+    
     def get_ledger_stats(self):
         """Get ledger statistics"""
-        total_supply = sum(self.accounts.values()) + sum(
-            lock['amount'] for lock in self.locked_funds.values()
-        )
+        self.flush()
+        if self.debug:
+            assert self._total_supply == sum(self._balances) + sum(
+                lock.amount for lock in self.locked_funds.values()
+            ), "total supply out of sync with balances"
         return {
-            'total_accounts': len(self.accounts),
-            'total_supply': total_supply,
-            'total_transactions': len(self.transaction_history),
+            'total_accounts': len(self._name_to_idx),
+            'total_supply': self._total_supply,
+            'total_transactions': self._tx_count,
             'locked_funds': len(self.locked_funds)
         }
 
@@ -6,7 +6,8 @@ of the agent-to-agent marketplace.
 """
 import argparse
 import time
-import random
+import numpy as np
+from collections import defaultdict
 from typing import List, Dict, Any
 from agents.agent_a import agent_a
 from agents.agent_b import agent_b
@@ -34,29 +35,54 @@ def initialize_system():
     
     return agents
 
-def run_simulation(agents: Dict[str, Any], num_rounds: int = 10):
+def run_simulation(agents: Dict[str, Any], num_rounds: int = 10, pause: float = 0.0):
     """Run an automated simulation of the marketplace"""
     print(f"\n🚀 Starting simulation with {num_rounds} rounds...\n")
     
+    # Pre-sample all per-round randomness in a few vectorized draws
+    names = tuple(agents.keys())
+    rng = np.random.default_rng()
+    sender_idx = rng.integers(0, len(names), size=num_rounds)
+    # Offsetting by 1..n-1 (mod n) picks a receiver other than the sender
+    receiver_idx = (sender_idx + rng.integers(1, len(names), size=num_rounds)) % len(names)
+    service_u = rng.random(num_rounds)
+    price_u = rng.random(num_rounds)
+    urgency = rng.random(num_rounds)
+    fallback_u = rng.random(num_rounds)
+    satisfaction_draws = rng.uniform(0.7, 1.0, size=num_rounds)
+    
+    # Inverted index of providers per service, built once per run
+    agent_services = {name: tuple(agent.services) for name, agent in agents.items()}
+    service_to_providers = defaultdict(list)
+    for name, agent in agents.items():
+        for service in agent.services:
+            service_to_providers[service].append(name)
+    # Capable providers excluding the requester, keyed by (service, sender)
+    capable_by_sender = {
+        (service, sender): tuple(name for name in providers if name != sender)
+        for service, providers in service_to_providers.items()
+        for sender in names
+    }
+    
     results = []
     for i in range(num_rounds):
         # Randomly select sender and service
-        sender = random.choice(list(agents.keys()))
-        receiver_options = [name for name in agents.keys() if name != sender]
-        receiver = random.choice(receiver_options)
+        sender = names[sender_idx[i]]
+        receiver = names[receiver_idx[i]]
         receiver_agent = agents[receiver]
+        receiver_services = receiver_agent.services
         
         # Check if receiver has any services
-        if not receiver_agent.services:
+        if not receiver_services:
             print(f"  ⚠️ {receiver} has no services available")
             continue
             
-        service_type = random.choice(list(receiver_agent.services.keys()))
-        base_price = receiver_agent.services[service_type]
-        offered_price = random.randint(
-            int(base_price * 0.5), 
-            int(base_price * 1.5)
-        )
+        services = agent_services[receiver]
+        service_type = services[int(service_u[i] * len(services))]
+        base_price = receiver_services[service_type]
+        # Uniform integer offer in [50%, 150%] of the base price
+        low, high = int(base_price * 0.5), int(base_price * 1.5)
+        offered_price = low + int(price_u[i] * (high - low + 1))
         
         # Create request
         request = ServiceRequest(
@@ -69,16 +95,15 @@ def run_simulation(agents: Dict[str, Any], num_rounds: int = 10):
         print(f"\n🔹 Round {i+1}: {sender} requesting {service_type} from {receiver}")
         
         # Find agents that can provide this service
-        capable_agents = [name for name, agent in agents.items() 
-                         if service_type in agent.services and name != sender]
+        capable_agents = capable_by_sender[(service_type, sender)]
         
         if not capable_agents:
             print(f"  ⚠️ No agents available to provide {service_type}")
             continue
         
         # Use contextual bandit for selection (only from capable agents)
-        context = contextual_bandit.get_context(
-            service_type, random.random(), offered_price, 
+        context = contextual_bandit.get_bucketed_context(
+            service_type, urgency[i], offered_price, 
             time.time() % 24 / 24
         )
         
@@ -89,21 +114,22 @@ def run_simulation(agents: Dict[str, Any], num_rounds: int = 10):
             selected_agent = contextual_bandit.select_agent(context)
             # Verify the selected agent can provide the service
             if selected_agent not in capable_agents:
-                selected_agent = random.choice(capable_agents)
+                selected_agent = capable_agents[int(fallback_u[i] * len(capable_agents))]
         
         if selected_agent != receiver:
             print(f"  🔄 Bandit redirected to {selected_agent}")
             receiver = selected_agent
             receiver_agent = agents[receiver]
+            receiver_services = receiver_agent.services
             request.receiver = receiver
         
         # Double-check that the final receiver can provide the service
-        if service_type not in receiver_agent.services:
+        market_price = receiver_services.get(service_type)
+        if market_price is None:
             print(f"  ❌ Error: {receiver} cannot provide {service_type}")
             continue
         
         # Negotiation
-        market_price = receiver_agent.services[service_type]
         agent_reputation = receiver_agent.reputation
         negotiation_result, final_price = global_negotiator.negotiate(
             service_type, offered_price, market_price, agent_reputation
@@ -117,7 +143,7 @@ def run_simulation(agents: Dict[str, Any], num_rounds: int = 10):
                 print(f"  ✅ Success! Cost: {response.cost}, Time: {response.execution_time:.1f}s")
                 
                 # Record successful transaction
-                satisfaction = random.uniform(0.7, 1.0)
+                satisfaction = float(satisfaction_draws[i])
                 contextual_bandit.update_weights(
                     receiver, context, satisfaction
                 )
@@ -173,7 +199,8 @@ def run_simulation(agents: Dict[str, Any], num_rounds: int = 10):
                 "time": None
             })
         
-        time.sleep(0.5)  # Pause between rounds
+        if pause:
+            time.sleep(pause)  # Pause between rounds
     
     return results
 
@@ -182,21 +209,28 @@ def display_stats(agents: Dict[str, Any], results: List[Dict]):
     print("\n📊 Simulation Results:")
     print(f"Total transactions: {len(results)}")
     
-    successful = sum(1 for r in results if r['status'] == 'success')
+    # Single pass over the results
+    successful = total_price = total_time = 0
+    for r in results:
+        if r['status'] == 'success':
+            successful += 1
+            total_price += r['price']
+            total_time += r['time']
     print(f"Successful transactions: {successful} ({successful/len(results)*100:.1f}%)" if results else "No transactions completed")
     
     if successful > 0:
-        avg_price = sum(r['price'] for r in results if r['price']) / successful
-        avg_time = sum(r['time'] for r in results if r['time']) / successful
+        avg_price = total_price / successful
+        avg_time = total_time / successful
         print(f"Average price: {avg_price:.1f} tokens")
         print(f"Average time: {avg_time:.1f}s")
     
     print("\n🤖 Agent Stats:")
+    balances = ledger_instance.snapshot()
     for name, agent in agents.items():
         print(f"{name}:")
-        print(f"  Balance: {ledger_instance.get_balance(name)} tokens")
+        print(f"  Balance: {balances.get(name, 0)} tokens")
         print(f"  Reputation: {agent.reputation:.1f}/5.0")
-        print(f"  Services completed: {len(agent.service_history)}")
+        print(f"  Services completed: {agent.services_completed}")
     
     print("\n🎰 Bandit Stats:")
     bandit_stats = service_bandit.get_stats()
@@ -222,6 +256,12 @@ def main():
         default=10,
         help='Number of simulation rounds to run'
     )
+    parser.add_argument(
+        '--pause',
+        type=float,
+        default=0.0,
+        help='Seconds to pause between rounds (e.g. 0.5 to follow along)'
+    )
     parser.add_argument(
         '--web', 
         action='store_true',
@@ -248,7 +288,7 @@ def main():
     for service in services:
         print(f"- {service}")
     
-    results = run_simulation(agents, args.rounds)
+    results = run_simulation(agents, args.rounds, pause=args.pause)
     display_stats(agents, results)
 
 if __name__ == "__main__":
@@ -3,6 +3,32 @@ import hashlib
 from typing import Dict, Any, Optional
 import time
 
+try:
+    import xxhash
+    
+    def _content_id(data: bytes) -> str:
+        return xxhash.xxh3_64_hexdigest(data)
+except ImportError:  # xxhash is optional; blake2b is the fastest stdlib fallback
+    def _content_id(data: bytes) -> str:
+        return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+try:
+    import orjson
+    
+    def _dumps_canonical(content: Any) -> bytes:
+        # NumPy scalars are float/int subclasses that stdlib json accepts; orjson needs the flag
+        return orjson.dumps(
+            content,
+            option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+    
+    _loads = orjson.loads
+except ImportError:  # orjson is optional; match its compact output with stdlib json
+    def _dumps_canonical(content: Any) -> bytes:
+        return json.dumps(content, sort_keys=True, separators=(',', ':')).encode()
+    
+    _loads = json.loads
+
 class MockIPFS:
     def __init__(self):
         self.storage = {}
@@ -11,19 +37,24 @@ class MockIPFS:
     def add(self, content: Any, content_type: str = "json") -> str:
         """Add content to storage and return CID"""
         if content_type == "json":
-            content_str = json.dumps(content, sort_keys=True)
+            content_bytes = _dumps_canonical(content)
         else:
-            content_str = str(content)
+            content_bytes = str(content).encode()
         
-        # Generate content ID (hash)
-        cid = hashlib.sha256(content_str.encode()).hexdigest()[:16]
+        # Generate content ID (hash) straight from the canonical bytes
+        cid = _content_id(content_bytes)
+        if cid in self.storage:
+            # Identical content is already stored; just count the extra reference
+            self.metadata[cid]['refcount'] += 1
+            return cid
         
-        self.storage[cid] = content_str
+        self.storage[cid] = content_bytes
         self.metadata[cid] = {
             'content_type': content_type,
-            'size': len(content_str),
+            'size': len(content_bytes),
             'timestamp': time.time(),
-            'access_count': 0
+            'access_count': 0,
+            'refcount': 1
         }
         
         return cid
@@ -32,15 +63,15 @@ class MockIPFS:
         """Retrieve content by CID"""
         if cid in self.storage:
             self.metadata[cid]['access_count'] += 1
-            content_str = self.storage[cid]
+            content_bytes = self.storage[cid]
             content_type = self.metadata[cid]['content_type']
             
             if content_type == "json":
                 try:
-                    return json.loads(content_str)
+                    return _loads(content_bytes)
                 except json.JSONDecodeError:
-                    return content_str
-            return content_str
+                    return content_bytes.decode()
+            return content_bytes.decode()
         return None
     
     def pin(self, cid: str) -> bool:
@@ -57,6 +88,7 @@ class MockIPFS:
         
         return {
             'total_objects': len(self.storage),
+            'logical_objects': sum(meta['refcount'] for meta in self.metadata.values()),
             'total_size_bytes': total_size,
             'total_accesses': total_access,
             'pinned_objects': sum(1 for meta in self.metadata.values() 
@@ -3,10 +3,11 @@ import time
 import random
 import sys
 import os
-import pandas as pd
 
-# Add parent directory to path
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# Add parent directory to path (once; Streamlit re-executes this script on every rerun)
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if _ROOT not in sys.path:
+    sys.path.append(_ROOT)
 
 from agents.agent_a import agent_a
 from agents.agent_b import agent_b
@@ -16,7 +17,6 @@ from ai.bandit_selection import service_bandit, contextual_bandit
 from communication.message_schema import ServiceRequest
 from communication.p2p_discovery import p2p_network
 from ledger.mock_ledger import ledger_instance
-import numpy as np
 
 # Page configuration
 st.set_page_config(
@@ -31,10 +31,18 @@ agents = {
     "Translator_B": agent_b,
     "Computer_C": agent_c
 }
+agent_names = tuple(agents.keys())
+# Possible providers for each requester (everyone but the requester)
+others = {sender: tuple(name for name in agent_names if name != sender) for sender in agent_names}
 
-# Register agents in P2P network
-for name, agent in agents.items():
-    p2p_network.register(name, agent.list_services())
+# Register agents in P2P network once per server process, not on every rerun
+@st.cache_resource
+def _init_network():
+    for name, agent in agents.items():
+        p2p_network.register(name, agent.list_services())
+    return True
+
+_init_network()
 
 st.title("🔄 A2A Economy Interaction Simulator")
 st.markdown("### Simulate autonomous agent interactions with AI-powered negotiation")
@@ -52,12 +60,11 @@ if simulation_mode == "Manual Request":
     col1, col2 = st.columns(2)
     
     with col1:
-        sender = st.selectbox("🤖 Requester Agent", options=list(agents.keys()))
+        sender = st.selectbox("🤖 Requester Agent", options=agent_names)
         
     with col2:
         # Get available receivers (excluding sender)
-        available_receivers = [name for name in agents.keys() if name != sender]
-        receiver = st.selectbox("🎯 Provider Agent", options=available_receivers)
+        receiver = st.selectbox("🎯 Provider Agent", options=others[sender])
     
     # Get services from selected receiver
     if receiver:
@@ -104,7 +111,7 @@ if simulation_mode == "Manual Request":
             st.success(f"Found {len(providers)} providers for '{service_type}'")
             
             # Initialize context (used for both bandit and reward recording)
-            context = contextual_bandit.get_context(
+            context = contextual_bandit.get_bucketed_context(
                 service_type, urgency, offered_price, 
                 time.time() % 24 / 24  # time of day
             )
@@ -193,13 +200,13 @@ elif simulation_mode == "Auto Simulation":
             status_text.text(f"Round {i + 1}/{num_rounds} - Running...")
             
             # Randomly select sender and service
-            sender = random.choice(list(agents.keys()))
-            receiver_options = [name for name in agents.keys() if name != sender]
-            receiver = random.choice(receiver_options)
+            sender = random.choice(agent_names)
+            receiver = random.choice(others[sender])
             receiver_agent = agents[receiver]
+            receiver_services = receiver_agent.services
             
-            service_type = random.choice(list(receiver_agent.services.keys()))
-            base_price = receiver_agent.services[service_type]
+            service_type = random.choice(list(receiver_services))
+            base_price = receiver_services[service_type]
             offered_price = random.randint(
                 int(base_price * 0.5), 
                 int(base_price * 1.5)
@@ -214,7 +221,7 @@ elif simulation_mode == "Auto Simulation":
             )
             
             # Initialize context
-            context = contextual_bandit.get_context(
+            context = contextual_bandit.get_bucketed_context(
                 service_type, random.random(), offered_price, 
                 time.time() % 24 / 24
             )
@@ -296,6 +303,7 @@ elif simulation_mode == "Auto Simulation":
             time.sleep(1.0 / speed)  # Control simulation speed
         
         status_text.text("✅ Simulation complete!")
+        import pandas as pd  # only this view needs pandas
         st.dataframe(pd.DataFrame(results))
 
 elif simulation_mode == "Batch Processing":
@@ -1,18 +1,23 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime, timedelta
+import numpy as np
+from datetime import datetime
+from collections import Counter
+import itertools
 import sys
+import threading
 import os
 
-# Add parent directory to path
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# Add parent directory to path (once; Streamlit re-executes this script on every rerun)
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if _ROOT not in sys.path:
+    sys.path.append(_ROOT)
 
 from agents.agent_a import agent_a
 from agents.agent_b import agent_b
 from agents.agent_c import agent_c
 from ledger.mock_ledger import ledger_instance
+from ledger.ledger_kernels import NS_PER_HOUR, summarize
 from ai.bandit_selection import service_bandit
 from ai.rl_negotiation import global_negotiator
 from communication.p2p_discovery import p2p_network
@@ -31,12 +36,174 @@ agents = {
     "Computer_C": agent_c
 }
 
-for name, agent in agents.items():
-    p2p_network.register(name, agent.list_services(), {
-        'reputation': agent.reputation,
-        'response_time': agent.response_time
+# Service listings are built once per rerun and shared by every view
+services_snapshot = {name: agent.list_services() for name, agent in agents.items()}
+# One entry per (agent, service) offering
+service_series = pd.Series(list(itertools.chain.from_iterable(services_snapshot.values())), dtype=object)
+
+@st.cache_resource
+def _init_network():
+    for name, agent in agents.items():
+        p2p_network.register(name, services_snapshot[name], {
+            'reputation': agent.reputation,
+            'response_time': agent.response_time
+        })
+    return True
+
+_init_network()
+
+# Ledger reads are cached per rerun, keyed on the ledger's transaction count
+@st.cache_data(ttl=2)
+def _tx_frame(version: int) -> pd.DataFrame:
+    """All ledger transactions as one DataFrame for vectorized filtering"""
+    history = list(ledger_instance.get_transaction_history())
+    n = len(history)
+    local_tz = datetime.now().astimezone().tzinfo
+    timestamps = np.fromiter((tx.timestamp for tx in history), dtype=np.int64, count=n)
+    return pd.DataFrame({
+        "tx_id": [tx.tx_id for tx in history],
+        "sender": pd.Categorical([tx.sender for tx in history]),
+        "receiver": pd.Categorical([tx.receiver for tx in history]),
+        "amount": np.fromiter((tx.amount for tx in history), dtype=np.int64, count=n),
+        "service": pd.Categorical([tx.service for tx in history]),
+        "timestamp": pd.to_datetime(timestamps, unit='ns', utc=True).tz_convert(local_tz)
+    })
+
+@st.cache_resource
+def _hour_buckets() -> dict:
+    """Process-wide hourly volume shared by every session, guarded by a lock"""
+    return {'lock': threading.Lock(), 'n': 0, 'skipped': 0, 'hours': Counter()}
+
+def _hourly_volume():
+    """Sorted (local hour, volume) pairs, folding in only transactions added since the last call"""
+    agg = _hour_buckets()
+    with agg['lock']:
+        history = ledger_instance.get_transaction_history()
+        new = ledger_instance.transaction_count - agg['n']
+        kept = min(new, len(history))
+        agg['skipped'] += new - kept  # evicted from capped history before we saw them
+        if kept > 0:
+            txs = [history[-i] for i in range(kept, 0, -1)]  # deque indexing is O(1) near the end
+            utc_offset_ns = int(datetime.now().astimezone().utcoffset().total_seconds()) * 1_000_000_000
+            hours, hour_volumes = summarize(
+                np.fromiter((tx.timestamp for tx in txs), np.int64, kept),
+                np.fromiter((tx.amount for tx in txs), np.int64, kept),
+                utc_offset_ns
+            )
+            agg['hours'].update(dict(zip(hours.tolist(), hour_volumes.tolist())))
+        agg['n'] += new
+        return sorted(agg['hours'].items()), agg['skipped']
+
+@st.cache_data(ttl=2)
+def _balances(agent_names: tuple, version: int) -> np.ndarray:
+    """Balances of the given agents as of the given transaction count"""
+    return np.array(ledger_instance.get_balances(agent_names), dtype=np.int64)
+
+@st.cache_data
+def _services_df(agent_name: str, services: tuple) -> pd.DataFrame:
+    """Base-price table for one agent, keyed on its (service, price) pairs"""
+    return pd.DataFrame({
+        "Service": pd.Categorical([service for service, _ in services]),
+        "Base Price": np.array([price for _, price in services], dtype=np.float32)
     })
 
+# Figures are cached on their (hashable) inputs so no-op reruns reuse the layout
+FIGURE_CACHE_SIZE = 16  # per builder; old figures are evicted as the data changes
+# plotly is imported inside each builder, so it only loads once a figure is needed
+def _compact(fig, showlegend: bool = False):
+    """Trim margins, legend and hover templates off a small dashboard figure"""
+    fig.update_layout(showlegend=showlegend, margin=dict(l=0, r=0, t=30, b=0))
+    fig.update_traces(hovertemplate=None)
+    return fig
+
+@st.cache_resource(max_entries=FIGURE_CACHE_SIZE)
+def _balance_fig(agent_names: tuple, balances: tuple):
+    """Bar chart of current token balances"""
+    import plotly.express as px
+    return _compact(px.bar(
+        pd.DataFrame({"Agent": agent_names, "Balance": balances}), 
+        x="Agent", 
+        y="Balance", 
+        title="Current Token Balances"
+    ))
+
+@st.cache_resource(max_entries=FIGURE_CACHE_SIZE)
+def _price_fig(services: tuple, agent_names: tuple, prices: tuple):
+    """Grouped bar chart of service prices per agent"""
+    import plotly.express as px
+    return _compact(px.bar(
+        pd.DataFrame({"Service": services, "Agent": agent_names, "Price": prices}), 
+        x="Service", 
+        y="Price", 
+        color="Agent",
+        title="Service Pricing by Agent",
+        barmode="group"
+    ), showlegend=True)
+
+@st.cache_resource(max_entries=FIGURE_CACHE_SIZE)
+def _volume_fig(hours: tuple, volumes: tuple):
+    """Line chart of transaction volume per local-time hour; hours must be sorted"""
+    times = pd.to_datetime(np.array(hours, dtype=np.int64) * NS_PER_HOUR, unit='ns')
+    if len(hours) >= 50:
+        # WebGL trace for long histories; SVG is cheaper for a handful of points
+        import plotly.graph_objects as go
+        fig = go.Figure(go.Scattergl(x=times, y=volumes, mode='lines'))
+        fig.update_layout(title="Transaction Volume by Time", xaxis_title="Time", yaxis_title="Volume")
+        return _compact(fig)
+    import plotly.express as px
+    df_volume = pd.DataFrame({"Time": times, "Volume": volumes})
+    return _compact(px.line(
+        df_volume, 
+        x="Time", 
+        y="Volume",
+        title="Transaction Volume by Time"
+    ))
+
+@st.cache_resource(max_entries=FIGURE_CACHE_SIZE)
+def _bandit_fig(agent_names: tuple, avg_rewards: tuple):
+    """Bar chart of average bandit reward per agent"""
+    import plotly.express as px
+    return _compact(px.bar(
+        pd.DataFrame({"Agent": agent_names, "Avg Reward": avg_rewards}),
+        x="Agent",
+        y="Avg Reward",
+        title="Average Reward by Agent"
+    ))
+
+@st.cache_resource(max_entries=FIGURE_CACHE_SIZE)
+def _actions_fig(actions: tuple, frequencies: tuple):
+    """Pie chart of preferred negotiation actions"""
+    import plotly.express as px
+    return _compact(px.pie(
+        pd.DataFrame({"Action": actions, "Frequency": frequencies}),
+        values="Frequency",
+        names="Action",
+        title="Negotiation Action Preferences"
+    ), showlegend=True)
+
+@st.cache_resource(max_entries=FIGURE_CACHE_SIZE)
+def _service_dist_fig(services: tuple, providers: tuple):
+    """Bar chart of provider count per service"""
+    import plotly.express as px
+    return _compact(px.bar(
+        pd.DataFrame({"Service": services, "Providers": providers}),
+        x="Service",
+        y="Providers",
+        title="Number of Providers per Service"
+    ))
+
+@st.cache_data(ttl=1)
+def _ledger_stats(version: int) -> dict:
+    """Ledger statistics as of the given transaction count"""
+    return ledger_instance.get_ledger_stats()
+
+@st.cache_data(ttl=1)
+def _net_stats(version: int) -> dict:
+    """P2P network statistics as of the given registry size"""
+    return p2p_network.get_network_stats()
+
+ledger_version = ledger_instance.transaction_count
+
 # Dashboard Header
 st.title("🤖 A2A Economy Dashboard")
 st.markdown("### Real-time Agent-to-Agent Marketplace Analytics")
@@ -61,7 +228,7 @@ if view_mode == "Overview":
         )
     
     with col2:
-        total_transactions = len(ledger_instance.get_transaction_history())
+        total_transactions = ledger_version
         st.metric(
             "Total Transactions", 
             total_transactions,
@@ -69,7 +236,7 @@ if view_mode == "Overview":
         )
     
     with col3:
-        network_stats = p2p_network.get_network_stats()
+        network_stats = _net_stats(len(p2p_network.registry))
         st.metric(
             "Services Available", 
             network_stats['unique_services'],
@@ -77,9 +244,7 @@ if view_mode == "Overview":
         )
     
     with col4:
-        total_volume = sum(
-            tx.amount for tx in ledger_instance.get_transaction_history()
-        )
+        total_volume = ledger_instance.total_volume
         st.metric(
             "Transaction Volume", 
             f"{total_volume} tokens",
@@ -88,37 +253,29 @@ if view_mode == "Overview":
     
     # Agent Balances
     st.subheader("💰 Agent Balances")
-    balance_data = []
-    for agent_name in agents.keys():
-        balance = ledger_instance.get_balance(agent_name)
-        balance_data.append({"Agent": agent_name, "Balance": balance})
-    
-    df_balances = pd.DataFrame(balance_data)
-    fig_balance = px.bar(
-        df_balances, 
-        x="Agent", 
-        y="Balance", 
-        title="Current Token Balances",
-        color="Balance",
-        color_continuous_scale="viridis"
-    )
+    agent_names = tuple(agents)
+    fig_balance = _balance_fig(agent_names, tuple(_balances(agent_names, ledger_version).tolist()))
     st.plotly_chart(fig_balance, use_container_width=True)
     
     # Service Offerings
     st.subheader("🔧 Available Services")
-    service_data = []
-    for agent_name, agent in agents.items():
-        for service, details in agent.list_services().items():
-            service_data.append({
-                "Agent": agent_name,
-                "Service": service,
-                "Price": details['price'],
-                "Success Rate": details['success_rate'],
-                "Reputation": details['reputation']
-            })
+    agent_col, service_col, price_col, success_col, reputation_col = [], [], [], [], []
+    for agent_name, listing in services_snapshot.items():
+        for service, details in listing.items():
+            agent_col.append(agent_name)
+            service_col.append(service)
+            price_col.append(details['price'])
+            success_col.append(details['success_rate'])
+            reputation_col.append(details['reputation'])
     
-    df_services = pd.DataFrame(service_data)
-    st.dataframe(df_services, use_container_width=True)
+    df_services = pd.DataFrame({
+        "Agent": agent_col,
+        "Service": service_col,
+        "Price": np.array(price_col, dtype=np.float32),
+        "Success Rate": np.array(success_col, dtype=np.float32),
+        "Reputation": reputation_col
+    })
+    st.table(df_services)
 
 elif view_mode == "Agent Details":
     st.subheader("🤖 Agent Performance Details")
@@ -139,27 +296,22 @@ elif view_mode == "Agent Details":
     
     with col2:
         st.write("**Services Offered**")
-        services_df = pd.DataFrame([
-            {"Service": service, "Base Price": price}
-            for service, price in agent.services.items()
-        ])
-        st.dataframe(services_df)
+        st.table(_services_df(agent.name, tuple(agent.services.items())))
     
     # Transaction History
     st.write("**Transaction History**")
-    agent_transactions = ledger_instance.get_transaction_history(agent.name)
-    if agent_transactions:
-        tx_data = []
-        for tx in agent_transactions[-10:]:  # Last 10 transactions
-            tx_data.append({
-                "Transaction ID": tx.tx_id,
-                "Type": "Received" if tx.receiver == agent.name else "Sent",
-                "Amount": tx.amount,
-                "Other Party": tx.sender if tx.receiver == agent.name else tx.receiver,
-                "Service": tx.service or "N/A",
-                "Timestamp": datetime.fromtimestamp(tx.timestamp).strftime("%Y-%m-%d %H:%M:%S")
-            })
-        st.dataframe(pd.DataFrame(tx_data))
+    df_tx = _tx_frame(ledger_version)
+    recent = df_tx[(df_tx.sender == agent.name) | (df_tx.receiver == agent.name)].tail(10)  # Last 10 transactions
+    if not recent.empty:
+        received = (recent.receiver == agent.name).to_numpy()
+        st.dataframe(pd.DataFrame({
+            "Transaction ID": recent.tx_id.to_numpy(),
+            "Type": np.where(received, "Received", "Sent"),
+            "Amount": recent.amount.to_numpy(),
+            "Other Party": np.where(received, recent.sender.astype(object), recent.receiver.astype(object)),
+            "Service": recent.service.astype(object).fillna("N/A").to_numpy(),
+            "Timestamp": recent.timestamp.dt.strftime("%Y-%m-%d %H:%M:%S").to_numpy()
+        }))
     else:
         st.info("No transaction history available")
 
@@ -171,53 +323,28 @@ elif view_mode == "Market Analytics":
     
     with col1:
         st.write("**Service Price Comparison**")
-        all_services = set()
-        for agent in agents.values():
-            all_services.update(agent.services.keys())
+        all_services = service_series.unique()
         
-        price_comparison = []
+        service_col, agent_col, price_col = [], [], []
         for service in all_services:
             for agent_name, agent in agents.items():
                 if service in agent.services:
-                    price_comparison.append({
-                        "Service": service,
-                        "Agent": agent_name,
-                        "Price": agent.services[service]
-                    })
+                    service_col.append(service)
+                    agent_col.append(agent_name)
+                    price_col.append(agent.services[service])
         
-        if price_comparison:
-            df_prices = pd.DataFrame(price_comparison)
-            fig_prices = px.bar(
-                df_prices, 
-                x="Service", 
-                y="Price", 
-                color="Agent",
-                title="Service Pricing by Agent",
-                barmode="group"
-            )
+        if service_col:
+            fig_prices = _price_fig(tuple(service_col), tuple(agent_col), tuple(price_col))
             st.plotly_chart(fig_prices, use_container_width=True)
     
     with col2:
         st.write("**Transaction Volume Over Time**")
-        transactions = ledger_instance.get_transaction_history()
-        if transactions:
-            # Group transactions by hour
-            tx_by_time = {}
-            for tx in transactions:
-                hour = datetime.fromtimestamp(tx.timestamp).strftime("%H:00")
-                tx_by_time[hour] = tx_by_time.get(hour, 0) + tx.amount
-            
-            df_volume = pd.DataFrame([
-                {"Time": time, "Volume": volume} 
-                for time, volume in tx_by_time.items()
-            ])
-            
-            fig_volume = px.line(
-                df_volume, 
-                x="Time", 
-                y="Volume",
-                title="Transaction Volume by Time"
-            )
+        hour_volumes, skipped = _hourly_volume()
+        if skipped:
+            st.warning(f"{skipped} transactions left the in-memory history before they were bucketed")
+        if hour_volumes:
+            hours, volumes = zip(*hour_volumes)
+            fig_volume = _volume_fig(hours, volumes)
             st.plotly_chart(fig_volume, use_container_width=True)
         else:
             st.info("No transaction data available")
@@ -231,24 +358,17 @@ elif view_mode == "ML Performance":
     with col1:
         st.write("**Multi-Armed Bandit Stats**")
         bandit_stats = service_bandit.get_stats()
-        df_bandit = pd.DataFrame([
-            {
-                "Agent": agent,
-                "Selections": stats["selections"],
-                "Avg Reward": stats["avg_reward"],
-                "Total Reward": stats["total_reward"]
-            }
-            for agent, stats in bandit_stats.items()
-        ])
-        st.dataframe(df_bandit)
+        n = len(bandit_stats)
+        df_bandit = pd.DataFrame({
+            "Agent": list(bandit_stats),
+            "Selections": np.fromiter((s["selections"] for s in bandit_stats.values()), np.int64, n),
+            "Avg Reward": np.fromiter((s["avg_reward"] for s in bandit_stats.values()), np.float32, n),
+            "Total Reward": np.fromiter((s["total_reward"] for s in bandit_stats.values()), np.float32, n)
+        })
+        st.table(df_bandit)
         
         if not df_bandit.empty:
-            fig_bandit = px.bar(
-                df_bandit,
-                x="Agent",
-                y="Avg Reward",
-                title="Average Reward by Agent"
-            )
+            fig_bandit = _bandit_fig(tuple(df_bandit["Agent"]), tuple(df_bandit["Avg Reward"]))
             st.plotly_chart(fig_bandit, use_container_width=True)
     
     with col2:
@@ -256,16 +376,9 @@ elif view_mode == "ML Performance":
         negotiation_stats = global_negotiator.get_strategy_stats()
         
         if "action_preferences" in negotiation_stats:
-            df_actions = pd.DataFrame([
-                {"Action": action, "Frequency": freq}
-                for action, freq in negotiation_stats["action_preferences"].items()
-            ])
-            
-            fig_actions = px.pie(
-                df_actions,
-                values="Frequency",
-                names="Action",
-                title="Negotiation Action Preferences"
+            action_preferences = negotiation_stats["action_preferences"]
+            fig_actions = _actions_fig(
+                tuple(action_preferences), tuple(action_preferences.values())
             )
             st.plotly_chart(fig_actions, use_container_width=True)
         
@@ -276,8 +389,8 @@ elif view_mode == "Network Stats":
     st.subheader("🌐 Network Statistics")
     
     # Network Overview
-    network_stats = p2p_network.get_network_stats()
-    ledger_stats = ledger_instance.get_ledger_stats()
+    network_stats = _net_stats(len(p2p_network.registry))
+    ledger_stats = _ledger_stats(ledger_version)
     
     col1, col2, col3 = st.columns(3)
     
@@ -301,22 +414,9 @@ elif view_mode == "Network Stats":
     
     # Service Distribution
     st.write("**Service Distribution**")
-    service_count = {}
-    for agent in agents.values():
-        for service in agent.services:
-            service_count[service] = service_count.get(service, 0) + 1
+    service_count = service_series.value_counts()
     
-    df_service_dist = pd.DataFrame([
-        {"Service": service, "Providers": count}
-        for service, count in service_count.items()
-    ])
-    
-    fig_service_dist = px.bar(
-        df_service_dist,
-        x="Service",
-        y="Providers",
-        title="Number of Providers per Service"
-    )
+    fig_service_dist = _service_dist_fig(tuple(service_count.index), tuple(service_count.tolist()))
     st.plotly_chart(fig_service_dist, use_container_width=True)
 
 # Real-time updates